@@ -0,0 +1,255 @@
+"""
+Token and cost budget governor for suite runs.
+
+Estimates each scenario's cost before it runs, tracks actual usage from
+response `usage` fields, and enforces suite-wide token/cost caps by
+downgrading the judge model and, once the budget is spent, refusing further
+scenarios so the run ends with a partial report.
+"""
+import asyncio
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+# USD per 1M tokens (input, output). Models not listed (e.g., gateway models)
+# are counted in tokens but treated as free.
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+}
+
+# Rough per-turn token sizes used for pre-run estimates
+SYSTEM_PROMPT_TOKENS = 250
+AGENT_REPLY_TOKENS = 350
+USER_MESSAGE_TOKENS = 60
+JUDGE_OVERHEAD_TOKENS = 400
+JUDGE_CRITERION_TOKENS = 20
+JUDGE_REPLY_TOKENS = 150
+
+
+def price(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Cost in USD of a call, using MODEL_PRICES."""
+    input_price, output_price = MODEL_PRICES.get(model.removeprefix("openai/"), (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+@dataclass
+class Estimate:
+    """Estimated token usage and cost of a scenario."""
+    tokens: int
+    cost: float
+
+
+def estimate_scenario(
+    max_turns: int,
+    agent_model: str,
+    simulator_model: str,
+    judge_model: str,
+    criteria_count: int = 5,
+    scripted_turns: int = 0,
+) -> Estimate:
+    """
+    Estimate the worst-case cost of a scenario running for `max_turns`.
+
+    Each turn is one simulator message, one agent reply and one judge call,
+    and every call re-reads the conversation so far. The first
+    `scripted_turns` user messages come from a script (see
+    `ScriptedUserAgent`), so they cost no simulator call.
+    """
+    tokens = 0
+    cost = 0.0
+    for turn in range(max_turns):
+        history = turn * (USER_MESSAGE_TOKENS + AGENT_REPLY_TOKENS)
+        calls = []
+        if turn >= scripted_turns:
+            calls.append((simulator_model, SYSTEM_PROMPT_TOKENS + history, USER_MESSAGE_TOKENS))
+        calls += [
+            (agent_model, SYSTEM_PROMPT_TOKENS + history + USER_MESSAGE_TOKENS, AGENT_REPLY_TOKENS),
+            (
+                judge_model,
+                JUDGE_OVERHEAD_TOKENS + criteria_count * JUDGE_CRITERION_TOKENS
+                + history + USER_MESSAGE_TOKENS + AGENT_REPLY_TOKENS,
+                JUDGE_REPLY_TOKENS,
+            ),
+        ]
+        for model, prompt_tokens, completion_tokens in calls:
+            tokens += prompt_tokens + completion_tokens
+            cost += price(model, prompt_tokens, completion_tokens)
+    return Estimate(tokens=tokens, cost=cost)
+
+
+@dataclass
+class ModelUsage:
+    """Accumulated usage for one model."""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+
+
+@dataclass
+class BudgetGovernor:
+    """
+    Tracks suite-wide spend and decides whether scenarios may run.
+
+    Attributes:
+        max_tokens: Suite-wide token cap (None for unlimited)
+        max_cost: Suite-wide cost cap in USD (None for unlimited)
+        judge_fallback_model: Cheaper judge model used once spend passes `downgrade_at`
+        downgrade_at: Fraction of the budget after which the judge is downgraded
+    """
+    max_tokens: Optional[int] = None
+    max_cost: Optional[float] = None
+    judge_fallback_model: Optional[str] = None
+    downgrade_at: float = 0.8
+    usage: dict[str, ModelUsage] = field(default_factory=dict)
+    refused: list[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_env(cls) -> "BudgetGovernor":
+        """Build a governor from BUDGET_* environment variables."""
+        max_tokens = os.getenv("BUDGET_MAX_TOKENS")
+        max_cost = os.getenv("BUDGET_MAX_COST_USD")
+        return cls(
+            max_tokens=int(max_tokens) if max_tokens else None,
+            max_cost=float(max_cost) if max_cost else None,
+            judge_fallback_model=os.getenv("BUDGET_JUDGE_FALLBACK_MODEL", "gpt-4o-mini"),
+            downgrade_at=float(os.getenv("BUDGET_DOWNGRADE_AT", "0.8")),
+        )
+
+    @property
+    def spent_tokens(self) -> int:
+        return sum(u.prompt_tokens + u.completion_tokens for u in self.usage.values())
+
+    @property
+    def spent_cost(self) -> float:
+        return sum(u.cost for u in self.usage.values())
+
+    def spent_fraction(self) -> float:
+        """Largest fraction of any configured cap already spent."""
+        fractions = [0.0]
+        if self.max_tokens:
+            fractions.append(self.spent_tokens / self.max_tokens)
+        if self.max_cost:
+            fractions.append(self.spent_cost / self.max_cost)
+        return max(fractions)
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int):
+        """Record the usage of one model call."""
+        model = model.removeprefix("openai/")
+        usage = self.usage.setdefault(model, ModelUsage())
+        usage.calls += 1
+        usage.prompt_tokens += prompt_tokens
+        usage.completion_tokens += completion_tokens
+        usage.cost += price(model, prompt_tokens, completion_tokens)
+
+    def record_response(self, model: str, response):
+        """Record usage from an OpenAI-compatible response (ignored if absent)."""
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.record(model, usage.prompt_tokens or 0, usage.completion_tokens or 0)
+
+    def admit(self, name: str, estimate: Estimate) -> bool:
+        """
+        Decide whether a scenario fits in the remaining budget.
+
+        Refused scenarios are remembered for the final report.
+        """
+        over_tokens = self.max_tokens is not None and self.spent_tokens + estimate.tokens > self.max_tokens
+        over_cost = self.max_cost is not None and self.spent_cost + estimate.cost > self.max_cost
+        if over_tokens or over_cost:
+            self.refused.append(name)
+            return False
+        return True
+
+    def judge_model(self, requested: str) -> str:
+        """Return the judge model to use, downgraded once spend passes `downgrade_at`."""
+        if self.judge_fallback_model and self.spent_fraction() >= self.downgrade_at:
+            return self.judge_fallback_model
+        return requested
+
+    def meter(self) -> str:
+        """One-line throughput meter (tokens/sec and cost/sec since start)."""
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return (
+            f"{self.spent_tokens:,} tokens (${self.spent_cost:.4f})"
+            f" | {self.spent_tokens / elapsed:,.0f} tok/s"
+            f" | ${self.spent_cost / elapsed:.5f}/s"
+        )
+
+    def report(self) -> list[str]:
+        """Format spend per model, caps and refused scenarios as report lines."""
+        lines = []
+        for model, usage in sorted(self.usage.items()):
+            lines.append(
+                f"  {model:.<30} {usage.calls} calls, "
+                f"{usage.prompt_tokens:,} in / {usage.completion_tokens:,} out, ${usage.cost:.4f}"
+            )
+        caps = []
+        if self.max_tokens:
+            caps.append(f"{self.max_tokens:,} tokens")
+        if self.max_cost:
+            caps.append(f"${self.max_cost:.2f}")
+        lines.append(f"  {'Total':.<30} {self.meter()}")
+        lines.append(f"  {'Budget':.<30} {', '.join(caps) if caps else 'unlimited'}")
+        if self.refused:
+            lines.append(f"  {'Not run (budget)':.<30} {', '.join(self.refused)}")
+        return lines
+
+
+async def live_meter(
+    governor: BudgetGovernor,
+    interval: float = 5.0,
+    write: Optional[Callable[[str], None]] = None,
+):
+    """
+    Print the governor's meter every `interval` seconds until cancelled.
+
+    Scenario draws its spinner and conversation on stdout, and anything else
+    written to the terminal meanwhile gets overwritten. So without a `write`
+    callback the meter only goes live when stdout is not a terminal (e.g., CI
+    logs), one line at a time on the real stderr; on a terminal the final
+    report is shown instead. Pass `write` when the caller has a safe place to
+    print (e.g., pytest's terminal reporter while Scenario's output is
+    captured).
+
+    The meter runs on the caller's event loop, so ticks are delayed while
+    the loop is blocked (Scenario's simulator and judge calls are synchronous).
+    """
+    if write is None:
+        if sys.stdout.isatty():
+            return
+
+        def write(line: str):
+            sys.__stderr__.write(line + "\n")
+            sys.__stderr__.flush()
+
+    while True:
+        await asyncio.sleep(interval)
+        write(f"  💰 {governor.meter()}")
+
+
+def track_litellm_usage(governor: BudgetGovernor):
+    """
+    Record usage of Scenario's own LLM calls (user simulator and judge).
+
+    Scenario calls models through litellm, so a success callback is the only
+    place their `usage` is visible.
+    """
+    import litellm
+    from litellm.integrations.custom_logger import CustomLogger
+
+    class _BudgetLogger(CustomLogger):
+        def log_success_event(self, kwargs, response_obj, start_time, end_time):
+            governor.record_response(kwargs.get("model", "unknown"), response_obj)
+
+        async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
+            governor.record_response(kwargs.get("model", "unknown"), response_obj)
+
+    litellm.callbacks.append(_BudgetLogger())
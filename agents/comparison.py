@@ -0,0 +1,183 @@
+"""
+Side-by-side comparison of gateway models on the same conversation turn.
+
+Sends one turn to every candidate model concurrently through
+`CustomGatewayClient`, measures latency, time to first token and output
+tokens, then has a JudgeAgent grade each response against the recipe
+criteria, and ranks the models by quality, then latency.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+import scenario
+from agents.preflight import client_backend, run_preflight
+from agents.recipe_agent import CustomGatewayClient
+from agents.scripted_user import ScriptedUserAgent
+
+
+@dataclass
+class ModelRun:
+    """Measurements and verdict for one candidate model."""
+    model: str
+    content: str = ""
+    latency: Optional[float] = None
+    ttft: Optional[float] = None
+    output_tokens: Optional[int] = None
+    passed: Optional[bool] = None
+    passed_criteria: list[str] = field(default_factory=list)
+    failed_criteria: list[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def quality(self) -> float:
+        """Fraction of judged criteria met."""
+        judged = len(self.passed_criteria) + len(self.failed_criteria)
+        if not judged:
+            return 1.0 if self.passed else 0.0
+        return len(self.passed_criteria) / judged
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Output tokens per second after the first token."""
+        if not self.output_tokens or self.latency is None or self.ttft is None or self.latency <= self.ttft:
+            return None
+        return self.output_tokens / (self.latency - self.ttft)
+
+
+class _ReplayAgent(scenario.AgentAdapter):
+    """Agent adapter returning an already generated response, so the judge can grade it."""
+
+    def __init__(self, content: str):
+        self.content = content
+
+    async def call(self, input: scenario.AgentInput) -> scenario.AgentReturnTypes:
+        return self.content
+
+
+async def run_turn(gateway: CustomGatewayClient, model: str, messages: list[dict]) -> ModelRun:
+    """
+    Stream one completion and measure it.
+
+    Output tokens come from the final usage chunk when the gateway sends
+    one, otherwise from the number of content chunks (roughly one token each).
+    """
+    run = ModelRun(model=model)
+    parts = []
+    start = time.perf_counter()
+    try:
+        stream = await gateway.chat_completion_stream(model=model, messages=messages)
+        async for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                run.output_tokens = chunk.usage.completion_tokens
+            if chunk.choices and chunk.choices[0].delta.content:
+                if run.ttft is None:
+                    run.ttft = time.perf_counter() - start
+                parts.append(chunk.choices[0].delta.content)
+    except Exception as e:
+        run.error = str(e)
+        return run
+
+    run.latency = time.perf_counter() - start
+    run.content = "".join(parts)
+    if run.output_tokens is None:
+        run.output_tokens = len(parts)
+    return run
+
+
+async def judge_run(run: ModelRun, conversation: list[dict], judge_model: str, criteria: list[str]):
+    """Grade a model's response to the last user message of `conversation`."""
+    if run.error:
+        return
+    try:
+        result = await scenario.run(
+            name=f"model comparison: {run.model}",
+            description="Grade a single recipe agent response to the user's request.",
+            agents=[
+                ScriptedUserAgent(turns=[conversation[-1]["content"]]),
+                _ReplayAgent(run.content),
+                scenario.JudgeAgent(model=judge_model, criteria=criteria),
+            ],
+            script=[
+                *(scenario.message(message) for message in conversation[:-1]),
+                scenario.user(),
+                scenario.agent(),
+                scenario.judge(),
+            ],
+        )
+    except Exception as e:
+        run.error = f"judge failed: {e}"
+        return
+    run.passed = result.success
+    run.passed_criteria = list(getattr(result, "passed_criteria", None) or [])
+    run.failed_criteria = list(getattr(result, "failed_criteria", None) or [])
+
+
+def rank(runs: list[ModelRun]) -> list[ModelRun]:
+    """Order runs: passing first, then by quality, then fastest."""
+    return sorted(
+        runs,
+        key=lambda run: (
+            run.error is not None,
+            not run.passed,
+            -run.quality,
+            run.latency if run.latency is not None else float("inf"),
+        ),
+    )
+
+
+async def compare_models(
+    gateway: CustomGatewayClient,
+    models: list[str],
+    conversation: list[dict],
+    system_prompt: str,
+    judge_model: str,
+    criteria: list[str],
+    warm_up: bool = True,
+) -> list[ModelRun]:
+    """
+    Send the same turn to every model concurrently, judge the responses and rank them.
+
+    Args:
+        gateway: Gateway client shared by all candidates
+        models: Candidate model identifiers
+        conversation: User/assistant messages; the last one must be the user turn to answer
+        system_prompt: System prompt of the agent under test
+        judge_model: JudgeAgent model
+        criteria: Criteria the judge grades each response against
+        warm_up: Warm each model up first so cold starts don't skew latency
+    """
+    if warm_up:
+        await run_preflight([client_backend(model, gateway.client, model) for model in models], pool_size=1)
+
+    messages = [{"role": "system", "content": system_prompt}, *conversation]
+    runs = await asyncio.gather(*(run_turn(gateway, model, messages) for model in models))
+    await asyncio.gather(*(judge_run(run, conversation, judge_model, criteria) for run in runs))
+    return rank(runs)
+
+
+def format_comparison_report(runs: list[ModelRun]) -> list[str]:
+    """Format ranked runs as a table plus a recommendation."""
+    lines = [
+        f"  {'#':>2}  {'Model':<32} {'Verdict':<8} {'Quality':>7} {'Latency':>9} {'TTFT':>8} {'Tokens':>7} {'Tok/s':>7}",
+        "  " + "─" * 88,
+    ]
+    for position, run in enumerate(runs, start=1):
+        if run.error:
+            lines.append(f"  {position:>2}  {run.model:<32} ⚠️  {run.error[:50]}")
+            continue
+        verdict = "pass" if run.passed else "fail"
+        tokens_per_second = f"{run.tokens_per_second:.0f}" if run.tokens_per_second else "-"
+        ttft = f"{run.ttft * 1000:.0f} ms" if run.ttft is not None else "-"
+        lines.append(
+            f"  {position:>2}  {run.model:<32} {verdict:<8} {run.quality:>7.0%}"
+            f" {run.latency * 1000:>6.0f} ms {ttft:>8} {run.output_tokens:>7} {tokens_per_second:>7}"
+        )
+
+    best = next((run for run in runs if run.passed and not run.error), None)
+    lines.append("")
+    if best:
+        lines.append(f"  ✅ Fastest passing model: {best.model} ({best.latency * 1000:.0f} ms)")
+    else:
+        lines.append("  ❌ No model passed all criteria")
+    return lines
@@ -0,0 +1,256 @@
+"""
+Embedding support for the custom gateway: micro-batching and vector caching.
+"""
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+
+# ============================================================================
+# VECTOR CACHES
+# ============================================================================
+
+def cache_key(model: str, text: str) -> str:
+    """Build a stable cache key for a (model, text) pair."""
+    return hashlib.sha256(f"{model}\x00{text}".encode()).hexdigest()
+
+
+class LRUVectorCache:
+    """
+    In-memory LRU cache of embedding vectors, bounded by total bytes.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Upper bound on the memory held by cached vectors
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._vectors: OrderedDict[str, np.ndarray] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the cached vector for key (marking it recently used), or None."""
+        vector = self._vectors.get(key)
+        if vector is not None:
+            self._vectors.move_to_end(key)
+        return vector
+
+    def put(self, key: str, vector: np.ndarray):
+        """Store a vector, evicting least recently used entries to stay in budget."""
+        if vector.nbytes > self.max_bytes:
+            return
+        old = self._vectors.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        self._vectors[key] = vector
+        self.nbytes += vector.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._vectors.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+
+class DiskVectorCache:
+    """
+    On-disk embedding cache backed by a memory-mapped float32 matrix.
+
+    Layout inside ``path``:
+        vectors.f32  - row-major matrix of shape (capacity, dim)
+        keys.bin     - append-only log of 32-byte key digests, one per row
+        meta.json    - {"dim": ...}
+
+    The dimension is fixed by the first vector stored. Vectors are only read
+    through the memory map, so they don't count towards the resident set;
+    the key index does (roughly 100 bytes per cached vector). Flushing
+    appends the new keys only, so its cost doesn't grow with the cache.
+    """
+
+    INITIAL_CAPACITY = 1024
+    KEY_BYTES = 32
+
+    def __init__(self, path: str, flush_every: int = 256):
+        """
+        Open (or create) a cache directory.
+
+        Args:
+            path: Directory holding the vector file and its index
+            flush_every: Persist after this many new vectors
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._keys_path = os.path.join(path, "keys.bin")
+        self._meta_path = os.path.join(path, "meta.json")
+        os.makedirs(path, exist_ok=True)
+
+        self.dim: Optional[int] = None
+        self._rows: dict[bytes, int] = {}
+        self._unflushed: list[bytes] = []
+        self._matrix: Optional[np.memmap] = None
+
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                self.dim = json.load(f)["dim"]
+            self._load_keys()
+            self._open()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _load_keys(self):
+        """Read the key log (ignoring a partially written last entry)."""
+        if not os.path.exists(self._keys_path):
+            return
+        with open(self._keys_path, "rb") as f:
+            data = f.read()
+        for row in range(len(data) // self.KEY_BYTES):
+            self._rows[data[row * self.KEY_BYTES:(row + 1) * self.KEY_BYTES]] = row
+
+    def _open(self, capacity: Optional[int] = None):
+        """(Re)map the vector file, growing it to hold `capacity` rows."""
+        row_bytes = self.dim * np.dtype(np.float32).itemsize
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        if capacity is not None and capacity * row_bytes > size:
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+            size = capacity * row_bytes
+        self._matrix = np.memmap(
+            self._vectors_path,
+            dtype=np.float32,
+            mode="r+",
+            shape=(size // row_bytes, self.dim),
+        )
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return a copy of the cached vector for key, or None."""
+        row = self._rows.get(bytes.fromhex(key))
+        if row is None:
+            return None
+        return np.array(self._matrix[row])
+
+    def put(self, key: str, vector: np.ndarray):
+        """Append a vector to the cache (no-op if key is already present)."""
+        digest = bytes.fromhex(key)
+        if digest in self._rows:
+            return
+        if self.dim is None:
+            self.dim = int(vector.shape[-1])
+            with open(self._meta_path, "w") as f:
+                json.dump({"dim": self.dim}, f)
+            self._open(max(self.INITIAL_CAPACITY, len(self._rows)))
+        if vector.shape[-1] != self.dim:
+            raise ValueError(f"Vector dimension {vector.shape[-1]} does not match cache dimension {self.dim}")
+
+        row = len(self._rows)
+        if row >= self._matrix.shape[0]:
+            self._matrix.flush()
+            self._open(self._matrix.shape[0] * 2)
+        self._matrix[row] = vector
+        self._rows[digest] = row
+
+        self._unflushed.append(digest)
+        if len(self._unflushed) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Persist pending vectors, then append their keys (no-op if nothing is new)."""
+        if not self._unflushed:
+            return
+        # Vectors first: a key on disk always points at a written row
+        self._matrix.flush()
+        with open(self._keys_path, "ab") as f:
+            f.write(b"".join(self._unflushed))
+        self._unflushed = []
+
+
+# ============================================================================
+# MICRO-BATCHER
+# ============================================================================
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embedding requests into batched gateway calls.
+
+    Callers await `embed(text)`; texts submitted within `max_wait` seconds of
+    each other (up to `max_batch_size`) are sent in a single request.
+    Identical texts in flight share one slot in the batch; each caller gets
+    its own shielded view of the result, so cancelling one caller does not
+    cancel the request for the others.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[list[str]], Awaitable[list[list[float]]]],
+        max_batch_size: int = 64,
+        max_wait: float = 0.01,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            embed_batch: Coroutine function embedding a list of texts in order
+            max_batch_size: Maximum number of distinct texts per request
+            max_wait: Seconds to wait for more texts before flushing a batch
+        """
+        self.embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Strong references to in-flight requests, so they can't be garbage-collected
+        self._tasks: set[asyncio.Task] = set()
+
+    def embed(self, text: str) -> asyncio.Future:
+        """Queue a text for embedding and return a future for its vector."""
+        future = self._pending.get(text)
+        if future is not None:
+            return asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[text] = future
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return asyncio.shield(future)
+
+    def _flush(self):
+        """Hand the pending texts to a background request."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        task = asyncio.get_running_loop().create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: dict[str, asyncio.Future]):
+        """Run one batched request and resolve the waiting futures."""
+        texts = list(batch)
+        try:
+            vectors = await self.embed_batch(texts)
+            if len(vectors) != len(texts):
+                raise ValueError(f"Gateway returned {len(vectors)} embeddings for {len(texts)} inputs")
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, vector in zip(texts, vectors):
+            future = batch[text]
+            if not future.done():
+                future.set_result(np.asarray(vector, dtype=np.float32))
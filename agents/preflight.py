@@ -0,0 +1,166 @@
+"""
+Connection pre-flight and model warm-up before a suite starts.
+
+Opens a pool of connections to each backend (agent, user simulator, judge)
+and issues a minimal completion per model, so DNS, TLS, gateway auth and
+model cold-start latency are paid before the first measured turn.
+
+Connections only help if the measured turns reuse them, so warm-up must go
+through the same clients the scenarios use. The agent is warmed through its
+own async OpenAI client, whose pool is tied to the event loop: scenarios
+must run on that loop too (`scenario.arun`, not `scenario.run`, which
+starts a fresh loop per scenario). The simulator and judge are warmed
+through the synchronous `litellm.completion`, which is what Scenario calls
+for them (its sync client is cached and shared across threads).
+"""
+import asyncio
+import os
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+from openai import AsyncOpenAI
+from agents.budget import BudgetGovernor
+
+
+PING_MESSAGES = [{"role": "user", "content": "ping"}]
+
+
+def preflight_enabled() -> bool:
+    """Whether the pre-flight phase should run (PREFLIGHT, default true)."""
+    return os.getenv("PREFLIGHT", "true").lower() == "true"
+
+
+def connection_pool_size() -> int:
+    """Connections to open per backend (CONNECTION_POOL_SIZE, default 4)."""
+    return int(os.getenv("CONNECTION_POOL_SIZE", "4"))
+
+
+@dataclass
+class Backend:
+    """A model endpoint to warm up, with a coroutine function sending one minimal request."""
+    name: str
+    model: str
+    ping: Optional[Callable[[], Awaitable]] = None
+    skip_reason: Optional[str] = None
+
+
+@dataclass
+class WarmupResult:
+    """Cold vs. warm latency for one backend (seconds)."""
+    backend: str
+    model: str
+    connections: int
+    cold_latency: Optional[float] = None
+    warm_latency: Optional[float] = None
+    error: Optional[str] = None
+
+
+def client_backend(name: str, client: AsyncOpenAI, model: str, budget: Optional[BudgetGovernor] = None) -> Backend:
+    """
+    Backend warmed through an OpenAI-compatible client (e.g., `RecipeAgent.client`).
+
+    Warm-up usage is recorded on `budget`, if given. (litellm backends are
+    recorded by `track_litellm_usage` instead.)
+    """
+    async def ping():
+        response = await client.chat.completions.create(model=model, messages=PING_MESSAGES, max_tokens=1)
+        if budget is not None:
+            budget.record_response(model, response)
+
+    return Backend(name, model, ping)
+
+
+def litellm_backend(name: str, model: str) -> Backend:
+    """
+    Backend warmed through the synchronous `litellm.completion`, the call
+    Scenario's simulator and judge make. Each ping runs in a worker thread,
+    so a wave of pings still opens `pool_size` connections concurrently.
+    """
+    async def ping():
+        import litellm
+        await asyncio.to_thread(litellm.completion, model=model, messages=PING_MESSAGES, max_tokens=1)
+
+    return Backend(name, model, ping)
+
+
+async def _timed(ping: Callable[[], Awaitable]) -> float:
+    """Run one ping and return its latency."""
+    start = time.perf_counter()
+    await ping()
+    return time.perf_counter() - start
+
+
+async def warm_up_backend(backend: Backend, pool_size: Optional[int] = None) -> WarmupResult:
+    """
+    Warm up a single backend.
+
+    The first wave of `pool_size` concurrent requests opens the connections
+    (cold latency is the slowest of them); a second wave reuses them (warm
+    latency is the median).
+    """
+    pool_size = pool_size or connection_pool_size()
+    result = WarmupResult(backend=backend.name, model=backend.model, connections=pool_size)
+    if backend.ping is None:
+        result.error = backend.skip_reason or "not configured"
+        return result
+
+    try:
+        cold = await asyncio.gather(*(_timed(backend.ping) for _ in range(pool_size)))
+        warm = await asyncio.gather(*(_timed(backend.ping) for _ in range(pool_size)))
+    except Exception as e:
+        result.error = str(e)
+        return result
+
+    result.cold_latency = max(cold)
+    result.warm_latency = statistics.median(warm)
+    return result
+
+
+async def run_preflight(backends: list[Backend], pool_size: Optional[int] = None) -> list[WarmupResult]:
+    """Warm up all backends concurrently."""
+    return await asyncio.gather(*(warm_up_backend(backend, pool_size) for backend in backends))
+
+
+def build_backends(
+    agent_client: Optional[AsyncOpenAI],
+    agent_model: str,
+    simulator_model: str,
+    judge_model: str,
+    budget: Optional[BudgetGovernor] = None,
+) -> list[Backend]:
+    """
+    Build the agent, simulator and judge backends.
+
+    Args:
+        agent_client: Client the agent under test uses (e.g., `RecipeAgent.client`)
+        agent_model: Model of the agent under test
+        simulator_model: UserSimulatorAgent model
+        judge_model: JudgeAgent model
+        budget: Optional budget governor recording the agent's warm-up usage
+    """
+    if agent_client is not None:
+        agent = client_backend("agent", agent_client, agent_model, budget)
+    else:
+        agent = Backend("agent", agent_model, skip_reason="agent not configured")
+    return [
+        agent,
+        litellm_backend("simulator", simulator_model),
+        litellm_backend("judge", judge_model),
+    ]
+
+
+def format_preflight_report(results: list[WarmupResult]) -> list[str]:
+    """Format warm-up results as report lines."""
+    lines = []
+    for result in results:
+        label = f"{result.backend} ({result.model})"
+        if result.error:
+            lines.append(f"  {label:.<40} ⚠️  skipped: {result.error[:60]}")
+        else:
+            lines.append(
+                f"  {label:.<40} cold {result.cold_latency * 1000:.0f} ms"
+                f" → warm {result.warm_latency * 1000:.0f} ms"
+                f" ({result.connections} connections)"
+            )
+    return lines
@@ -1,11 +1,16 @@
 """
 Recipe Agent with support for both OpenAI and custom gateway.
 """
+import asyncio
 import os
+import time
 from base64 import b64encode
-from typing import Optional
+from typing import Optional, Union
+import numpy as np
 import scenario
 from openai import AsyncOpenAI
+from agents.budget import BudgetGovernor
+from agents.embeddings import DiskVectorCache, EmbeddingBatcher, LRUVectorCache, cache_key
 
 
 # ============================================================================
@@ -24,6 +29,10 @@ class CustomGatewayClient:
         base_url: Optional[str] = None,
         username: Optional[str] = None,
         password: Optional[str] = None,
+        embedding_batch_size: int = 64,
+        embedding_batch_wait: float = 0.01,
+        embedding_cache_bytes: int = 64 * 1024 * 1024,
+        embedding_cache_dir: Optional[str] = None,
     ):
         """
         Initialize your gateway client.
@@ -33,12 +42,23 @@ class CustomGatewayClient:
             base_url: Your gateway base URL (e.g., "https://genai.iais.fraunhofer.de/api/v2")
             username: Gateway username for Basic Auth
             password: Gateway password for Basic Auth
+            embedding_batch_size: Max distinct texts per embeddings request
+            embedding_batch_wait: Seconds to collect concurrent embed() calls into one request
+            embedding_cache_bytes: Memory budget for the in-process vector cache
+            embedding_cache_dir: Optional directory for a memory-mapped on-disk vector cache
         """
         self.api_key = api_key or "xxxx"
         self.base_url = base_url
         self.username = username
         self.password = password
         
+        # Embedding batching and caching
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_batch_wait = embedding_batch_wait
+        self._embedding_batchers: dict[str, EmbeddingBatcher] = {}
+        self.embedding_cache = LRUVectorCache(max_bytes=embedding_cache_bytes)
+        self.embedding_disk_cache = DiskVectorCache(embedding_cache_dir) if embedding_cache_dir else None
+        
         # Build Basic Auth header
         if username and password:
             token_string = f"{username}:{password}"
@@ -89,6 +109,109 @@ class CustomGatewayClient:
         
         # Return the response (it's already OpenAI-compatible)
         return response
+    
+    async def chat_completion_stream(
+        self,
+        model: str,
+        messages: list[dict],
+        temperature: float = 0.7,
+        extra_headers: Optional[dict] = None,
+        extra_body: Optional[dict] = None,
+    ):
+        """
+        Call your gateway's chat completion endpoint with streaming.
+        
+        Same arguments as `chat_completion`. Usage is requested in the final
+        chunk (`stream_options.include_usage`); gateways that ignore it simply
+        return no usage.
+        
+        Returns:
+            Async iterator of OpenAI-compatible ChatCompletionChunk objects
+        """
+        return await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+            extra_headers=extra_headers,
+            extra_body=extra_body,
+        )
+    
+    async def embed(self, texts: Union[str, list[str]], model: str) -> np.ndarray:
+        """
+        Embed one or more texts through the gateway's embeddings endpoint.
+        
+        Cached vectors are served from memory (then disk, if configured).
+        Remaining texts are deduplicated and micro-batched with any other
+        concurrent embed() calls for the same model. New vectors go to the
+        disk cache, which persists them in batches (and on `aclose()`).
+        
+        Args:
+            texts: A single text or a list of texts
+            model: Embedding model identifier (e.g., "all-mpnet-base-v2")
+            
+        Returns:
+            float32 array of shape (dim,) for a single text, else (len(texts), dim)
+        """
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        
+        vectors = {}
+        missing = []
+        for text in dict.fromkeys(texts):
+            key = cache_key(model, text)
+            vector = self.embedding_cache.get(key)
+            if vector is None and self.embedding_disk_cache is not None:
+                vector = self.embedding_disk_cache.get(key)
+                if vector is not None:
+                    self.embedding_cache.put(key, vector)
+            if vector is None:
+                missing.append(text)
+            else:
+                vectors[text] = vector
+        
+        if missing:
+            batcher = self._embedding_batcher(model)
+            results = await asyncio.gather(*(batcher.embed(text) for text in missing))
+            for text, vector in zip(missing, results):
+                key = cache_key(model, text)
+                self.embedding_cache.put(key, vector)
+                if self.embedding_disk_cache is not None:
+                    self.embedding_disk_cache.put(key, vector)
+                vectors[text] = vector
+        
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        matrix = np.stack([vectors[text] for text in texts])
+        return matrix[0] if single else matrix
+    
+    def flush_embedding_cache(self):
+        """Persist the on-disk vector cache, if one is configured."""
+        if self.embedding_disk_cache is not None:
+            self.embedding_disk_cache.flush()
+    
+    async def aclose(self):
+        """Persist the vector cache (off the event loop) and close the underlying HTTP client."""
+        await asyncio.to_thread(self.flush_embedding_cache)
+        await self.client.close()
+    
+    def _embedding_batcher(self, model: str) -> EmbeddingBatcher:
+        """Get (or create) the micro-batcher for a model."""
+        batcher = self._embedding_batchers.get(model)
+        if batcher is None:
+            async def embed_batch(batch: list[str]) -> list[list[float]]:
+                response = await self.client.embeddings.create(model=model, input=batch)
+                return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            
+            batcher = EmbeddingBatcher(
+                embed_batch,
+                max_batch_size=self.embedding_batch_size,
+                max_wait=self.embedding_batch_wait,
+            )
+            self._embedding_batchers[model] = batcher
+        return batcher
 
 
 # ============================================================================
@@ -118,6 +241,7 @@ IMPORTANT RULES:
         use_custom_gateway: bool = False,
         model: str = "gpt-4o-mini",
         custom_gateway_config: Optional[dict] = None,
+        budget: Optional[BudgetGovernor] = None,
     ):
         """
         Initialize the recipe agent.
@@ -127,9 +251,13 @@ IMPORTANT RULES:
             model: Model identifier (works for both OpenAI and gateway)
             custom_gateway_config: Config dict for custom gateway
                 Example: {"api_key": "...", "base_url": "..."}
+            budget: Optional budget governor that records the agent's token usage
         """
         self.use_custom_gateway = use_custom_gateway
         self.model = model
+        self.budget = budget
+        # Model call latency (seconds) of each call() - useful with scripted users
+        self.turn_latencies: list[float] = []
         
         if use_custom_gateway:
             # Initialize custom gateway client
@@ -139,6 +267,7 @@ IMPORTANT RULES:
                 base_url=config.get("base_url"),
                 username=config.get("username"),
                 password=config.get("password"),
+                embedding_cache_dir=config.get("embedding_cache_dir"),
             )
         else:
             # Initialize OpenAI client
@@ -147,6 +276,20 @@ IMPORTANT RULES:
                 raise ValueError("OPENAI_API_KEY not found in environment")
             self.openai_client = AsyncOpenAI(api_key=api_key)
 
+    @property
+    def client(self) -> AsyncOpenAI:
+        """The underlying OpenAI-compatible client (gateway or OpenAI)."""
+        if self.use_custom_gateway:
+            return self.gateway_client.client
+        return self.openai_client
+
+    async def aclose(self):
+        """Close the agent's client (persisting the gateway's embedding cache)."""
+        if self.use_custom_gateway:
+            await self.gateway_client.aclose()
+        else:
+            await self.openai_client.close()
+
     async def call(self, input: scenario.AgentInput) -> scenario.AgentReturnTypes:
         """
         Process user messages and return agent response.
@@ -158,6 +301,7 @@ IMPORTANT RULES:
             *input.messages,
         ]
         
+        start = time.perf_counter()
         if self.use_custom_gateway:
             # Use custom gateway
             response = await self.gateway_client.chat_completion(
@@ -165,8 +309,6 @@ IMPORTANT RULES:
                 messages=messages,
                 temperature=0.7,
             )
-            # Response is already OpenAI-compatible ChatCompletion object
-            return response.choices[0].message
         else:
             # Use OpenAI
             response = await self.openai_client.chat.completions.create(
@@ -174,16 +316,21 @@ IMPORTANT RULES:
                 messages=messages,
                 temperature=0.7,
             )
-            return response.choices[0].message
+        self.turn_latencies.append(time.perf_counter() - start)
+        
+        if self.budget is not None:
+            self.budget.record_response(self.model, response)
+        # Response is already OpenAI-compatible ChatCompletion object
+        return response.choices[0].message
 
 
 # ============================================================================
 # FACTORY FUNCTIONS FOR EASY USAGE
 # ============================================================================
 
-def create_openai_agent(model: str = "gpt-4o-mini") -> RecipeAgent:
+def create_openai_agent(model: str = "gpt-4o-mini", budget: Optional[BudgetGovernor] = None) -> RecipeAgent:
     """Create agent using OpenAI (for local testing)."""
-    return RecipeAgent(use_custom_gateway=False, model=model)
+    return RecipeAgent(use_custom_gateway=False, model=model, budget=budget)
 
 
 def create_custom_gateway_agent(
@@ -192,6 +339,7 @@ def create_custom_gateway_agent(
     base_url: Optional[str] = None,
     username: Optional[str] = None,
     password: Optional[str] = None,
+    budget: Optional[BudgetGovernor] = None,
 ) -> RecipeAgent:
     """
     Create agent using custom gateway (for company environment).
@@ -202,6 +350,7 @@ def create_custom_gateway_agent(
         base_url: Gateway base URL (or use env var)
         username: Gateway username for Basic Auth (or use env var)
         password: Gateway password for Basic Auth (or use env var)
+        budget: Optional budget governor that records the agent's token usage
     """
     return RecipeAgent(
         use_custom_gateway=True,
@@ -211,6 +360,8 @@ def create_custom_gateway_agent(
             "base_url": base_url or os.getenv("CUSTOM_GATEWAY_BASE_URL"),
             "username": username or os.getenv("GENAI_USERNAME"),
             "password": password or os.getenv("GENAI_PASSWORD"),
+            "embedding_cache_dir": os.getenv("EMBEDDING_CACHE_DIR"),
         },
+        budget=budget,
     )
 
@@ -0,0 +1,90 @@
+"""
+Scripted user agent: plays fixed or templated user turns instead of an LLM.
+"""
+import re
+from typing import Optional
+import scenario
+
+
+# Bulleted or numbered lines, as in ingredient lists and cooking steps
+_LIST_LINE = re.compile(r"^\s*([-*•]|\d+[.)])\s")
+
+
+class ScriptedUserAgent(scenario.AgentAdapter):
+    """
+    User agent that replays a known conversation.
+
+    Each call returns the next scripted turn, so no simulator model is called
+    and the agent under test always sees the same user messages. If a
+    `fallback` user agent is given, it answers clarifying questions the agent
+    asks (which the script can't anticipate) as an extra turn, and continues
+    the conversation once the script runs out. A reply counts as clarifying
+    only if it is short, has no list content and ends with a question, so
+    an answer closing with "Would you like a variation?" doesn't consume a
+    scripted turn.
+
+    Use one instance per scenario run: the position in the script is kept on
+    the instance.
+    """
+
+    role = scenario.AgentRole.USER
+
+    def __init__(
+        self,
+        turns: list[str],
+        variables: Optional[dict] = None,
+        fallback: Optional[scenario.AgentAdapter] = None,
+        closing_message: str = "Thanks, that's all I needed!",
+        max_clarification_chars: int = 400,
+    ):
+        """
+        Initialize the scripted user.
+
+        Args:
+            turns: User messages in order; may contain `{placeholders}` if `variables` is given
+            variables: Values substituted into the turn templates (turns are used verbatim without it)
+            fallback: Optional user agent (e.g., UserSimulatorAgent) for unscripted turns
+            closing_message: Sent when the script is exhausted and there is no fallback
+            max_clarification_chars: Longer agent replies never count as clarifying questions
+        """
+        self.turns = [turn.format(**variables) for turn in turns] if variables is not None else list(turns)
+        self.fallback = fallback
+        self.closing_message = closing_message
+        self.max_clarification_chars = max_clarification_chars
+        self.scripted_calls = 0
+        self.fallback_calls = 0
+        self._position = 0
+
+    def _asks_clarification(self, messages: list) -> bool:
+        """Check whether the agent's last message is a clarifying question rather than an answer."""
+        for message in reversed(messages):
+            if message.get("role") != "assistant":
+                continue
+            content = message.get("content")
+            if not isinstance(content, str) or not content.strip():
+                return False
+            lines = content.strip().splitlines()
+            return (
+                len(content) <= self.max_clarification_chars
+                and not any(_LIST_LINE.match(line) for line in lines)
+                and lines[-1].rstrip(" *_").endswith("?")
+            )
+        return False
+
+    async def call(self, input: scenario.AgentInput) -> scenario.AgentReturnTypes:
+        """Return the next scripted turn, or defer to the fallback."""
+        use_fallback = self.fallback is not None and (
+            self._position >= len(self.turns)
+            or (self._position > 0 and self._asks_clarification(input.messages))
+        )
+        if use_fallback:
+            self.fallback_calls += 1
+            return await self.fallback.call(input)
+
+        if self._position >= len(self.turns):
+            return self.closing_message
+
+        turn = self.turns[self._position]
+        self._position += 1
+        self.scripted_calls += 1
+        return turn
@@ -0,0 +1,102 @@
+"""
+Script to compare gateway models side by side on the same recipe request.
+Ranks models by judge verdict and latency to pick the fastest passing one.
+"""
+import asyncio
+import os
+import warnings
+from dotenv import load_dotenv
+from agents.comparison import compare_models, format_comparison_report
+from agents.recipe_agent import CustomGatewayClient, RecipeAgent
+from list_models import fetch_chat_model_ids
+
+# Load environment variables
+load_dotenv()
+
+if not os.getenv("LANGWATCH_API_KEY"):
+    os.environ.setdefault("LANGWATCH_DISABLE_EVENTS", "true")
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+# Gateway Configuration
+GATEWAY_BASE_URL = os.getenv("CUSTOM_GATEWAY_BASE_URL", "https://genai.iais.fraunhofer.de/api/v2")
+GATEWAY_API_KEY = os.getenv("CUSTOM_GATEWAY_API_KEY", "xxxx")  # Hardcoded placeholder
+GENAI_USERNAME = os.getenv("GENAI_USERNAME")
+GENAI_PASSWORD = os.getenv("GENAI_PASSWORD")
+
+# Comparison Configuration
+COMPARE_MODELS = [model.strip() for model in os.getenv("COMPARE_MODELS", "").split(",") if model.strip()]
+COMPARE_PROMPT = os.getenv(
+    "COMPARE_PROMPT",
+    "I'm hungry and tired and have no money to order out. Can you give me a quick and easy recipe?",
+)
+JUDGE_MODEL = os.getenv("JUDGE_MODEL", "gpt-4o")
+
+CRITERIA = [
+    "Agent should not ask more than two follow-up questions",
+    "Agent should generate a recipe",
+    "Recipe should include a list of ingredients",
+    "Recipe should include step-by-step cooking instructions",
+    "Recipe should be vegetarian and not include any sort of meat",
+]
+
+
+async def main():
+    """Compare candidate models and print a ranked report."""
+    print("=" * 60)
+    print("MODEL COMPARISON TOOL")
+    print("=" * 60)
+
+    gateway = CustomGatewayClient(
+        api_key=GATEWAY_API_KEY,
+        base_url=GATEWAY_BASE_URL,
+        username=GENAI_USERNAME,
+        password=GENAI_PASSWORD,
+    )
+
+    try:
+        return await _compare(gateway)
+    finally:
+        await gateway.aclose()
+
+
+async def _compare(gateway: CustomGatewayClient) -> bool:
+    """Pick the candidates, run the comparison and print the report."""
+    models = COMPARE_MODELS
+    if not models:
+        print("\nCOMPARE_MODELS not set, using all chat models listed by the gateway...")
+        try:
+            models = await fetch_chat_model_ids(gateway.client)
+        except Exception as e:
+            print(f"\n❌ Error listing models: {e}")
+            print("\n💡 Tip: Set COMPARE_MODELS=model-a,model-b in .env")
+            return False
+    if not models:
+        print("\n❌ No candidate models found")
+        return False
+
+    print(f"\n🔧 Candidates: {', '.join(models)}")
+    print(f"   Judge Model: {JUDGE_MODEL}")
+    print(f"   Prompt: {COMPARE_PROMPT}")
+    print("\nWarming up, then sending the turn to all models concurrently...")
+
+    runs = await compare_models(
+        gateway,
+        models,
+        conversation=[{"role": "user", "content": COMPARE_PROMPT}],
+        system_prompt=RecipeAgent.SYSTEM_PROMPT,
+        judge_model=JUDGE_MODEL,
+        criteria=CRITERIA,
+    )
+
+    print("\n" + "=" * 60)
+    print("RANKING (quality, then latency)")
+    print("=" * 60 + "\n")
+    for line in format_comparison_report(runs):
+        print(line)
+    print()
+    return any(run.passed for run in runs)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    exit(0 if success else 1)
@@ -17,6 +17,20 @@ GATEWAY_API_KEY = os.getenv("CUSTOM_GATEWAY_API_KEY", "xxxx")  # Hardcoded place
 GENAI_USERNAME = os.getenv("GENAI_USERNAME")
 GENAI_PASSWORD = os.getenv("GENAI_PASSWORD")
 
+# Common patterns for embedding models
+EMBEDDING_MODEL_KEYWORDS = ["embed", "ada-002", "text-embedding", "mpnet", "sentence"]
+
+
+def is_embedding_model(model_id: str) -> bool:
+    """Guess from its name whether a model is an embedding model."""
+    return any(keyword in model_id.lower() for keyword in EMBEDDING_MODEL_KEYWORDS)
+
+
+async def fetch_chat_model_ids(client) -> list[str]:
+    """Return the IDs of non-embedding models listed by the gateway."""
+    models = await client.models.list()
+    return [model.id for model in models.data if not is_embedding_model(model.id)]
+
 
 async def create_client():
     """Create OpenAI client for custom gateway with Basic Auth."""
@@ -103,11 +117,7 @@ async def list_embedding_models(client):
         if models.data:
             # Check each model - some gateways mark embedding models differently
             for model in models.data:
-                model_id = model.id.lower()
-                # Common patterns for embedding models
-                if any(keyword in model_id for keyword in [
-                    "embed", "ada-002", "text-embedding", "mpnet", "sentence"
-                ]):
+                if is_embedding_model(model.id):
                     embedding_models.append(model.id)
         
         if embedding_models:
@@ -11,6 +11,8 @@ from io import StringIO
 from dotenv import load_dotenv
 import scenario
 from agents.recipe_agent import create_openai_agent, create_custom_gateway_agent
+from agents.budget import BudgetGovernor, estimate_scenario, live_meter, track_litellm_usage
+from agents.preflight import build_backends, format_preflight_report, preflight_enabled, run_preflight
 
 load_dotenv()
 
@@ -74,10 +76,40 @@ async def main():
     else:
         print_info("LangWatch", "⚠️  Disabled (set LANGWATCH_API_KEY to enable)")
     
+    budget = BudgetGovernor.from_env()
+    track_litellm_usage(budget)
+    
     if USE_CUSTOM_GATEWAY:
-        agent = create_custom_gateway_agent(model=AGENT_MODEL)
+        agent = create_custom_gateway_agent(model=AGENT_MODEL, budget=budget)
     else:
-        agent = create_openai_agent(model=AGENT_MODEL)
+        agent = create_openai_agent(model=AGENT_MODEL, budget=budget)
+    
+    if preflight_enabled():
+        print_section("Pre-flight")
+        backends = build_backends(agent.client, AGENT_MODEL, USER_SIMULATOR_MODEL, JUDGE_MODEL, budget)
+        for line in format_preflight_report(await run_preflight(backends)):
+            print(line)
+    
+    criteria = [
+        "Agent should not ask more than two follow-up questions",
+        "Agent should generate a recipe",
+        "Recipe should include a list of ingredients",
+        "Recipe should include step-by-step cooking instructions",
+        "Recipe should be vegetarian and not include any sort of meat",
+    ]
+    max_turns = 5
+    judge_model = budget.judge_model(JUDGE_MODEL)
+    estimate = estimate_scenario(max_turns, AGENT_MODEL, USER_SIMULATOR_MODEL, judge_model, len(criteria))
+    
+    print_section("Budget")
+    print_info("Estimated Tokens", f"~{estimate.tokens:,}")
+    print_info("Estimated Cost", f"~${estimate.cost:.4f}")
+    if not budget.admit("vegetarian recipe request", estimate):
+        print("\n  ⚠️  Scenario does not fit the configured budget, not running it.")
+        for line in budget.report():
+            print(line)
+        print("\n" + "═" * 70 + "\n")
+        return False
     
     print_section("Running Scenario")
     print("  Starting conversation simulation...\n")
@@ -92,26 +124,31 @@ async def main():
         "agents": [
             agent,
             scenario.UserSimulatorAgent(model=USER_SIMULATOR_MODEL),
-            scenario.JudgeAgent(
-                model=JUDGE_MODEL,
-                criteria=[
-                    "Agent should not ask more than two follow-up questions",
-                    "Agent should generate a recipe",
-                    "Recipe should include a list of ingredients",
-                    "Recipe should include step-by-step cooking instructions",
-                    "Recipe should be vegetarian and not include any sort of meat",
-                ],
-            ),
+            scenario.JudgeAgent(model=judge_model, criteria=criteria),
         ],
-        "max_turns": 5,
+        "max_turns": max_turns,
     }
     
-    if not LANGWATCH_ENABLED:
-        stderr_capture = StringIO()
-        with redirect_stderr(stderr_capture):
-            result = await scenario.run(**scenario_config)
-    else:
-        result = await scenario.run(**scenario_config)
+    meter = asyncio.create_task(live_meter(budget))
+    try:
+        if not LANGWATCH_ENABLED:
+            stderr_capture = StringIO()
+            with redirect_stderr(stderr_capture):
+                result = await scenario.arun(**scenario_config)
+        else:
+            result = await scenario.arun(**scenario_config)
+    finally:
+        meter.cancel()
+        await asyncio.gather(meter, return_exceptions=True)
+    
+    print_section("Budget")
+    for line in budget.report():
+        print(line)
+    
+    if agent.turn_latencies:
+        print_section("Agent Latency")
+        for turn, latency in enumerate(agent.turn_latencies, start=1):
+            print_info(f"Turn {turn}", f"{latency * 1000:.0f} ms")
     
     print_section("Results")
     
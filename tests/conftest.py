@@ -0,0 +1,100 @@
+"""
+Pytest session hooks for scenario tests.
+"""
+import asyncio
+import os
+from typing import Optional
+import pytest
+from dotenv import load_dotenv
+from agents.budget import BudgetGovernor, live_meter, track_litellm_usage
+from agents.preflight import build_backends, format_preflight_report, preflight_enabled, run_preflight
+
+load_dotenv()
+
+USE_CUSTOM_GATEWAY = os.getenv("USE_CUSTOM_GATEWAY", "false").lower() == "true"
+CUSTOM_MODEL = os.getenv("CUSTOM_MODEL", "Llama-3.3-70B-Instruct")
+AGENT_MODEL = CUSTOM_MODEL if USE_CUSTOM_GATEWAY else "gpt-4o-mini"
+USER_SIMULATOR_MODEL = os.getenv("USER_SIMULATOR_MODEL", "gpt-4o-mini")
+JUDGE_MODEL = os.getenv("JUDGE_MODEL", "gpt-4o")
+
+# Suite-wide budget governor, created by the `budget` fixture
+_budget: Optional[BudgetGovernor] = None
+
+
+def _write_lines(config, lines: list[str], title: Optional[str] = None):
+    """Write lines to the terminal, bypassing output capture (for use inside fixtures/hooks)."""
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+    if reporter is None:
+        return
+    capture = config.pluginmanager.get_plugin("capturemanager")
+    with capture.global_and_fixture_disabled():
+        reporter.ensure_newline()
+        if title:
+            reporter.write_sep("-", title)
+        for line in lines:
+            reporter.write_line(line)
+
+
+def pytest_collection_modifyitems(config, items):
+    """Run higher-priority scenarios first, so a budget cap drops the least important ones."""
+    def priority(item):
+        marker = item.get_closest_marker("priority")
+        return marker.args[0] if marker else 0
+
+    items.sort(key=priority, reverse=True)
+
+
+@pytest.fixture(scope="session")
+def budget() -> BudgetGovernor:
+    """Suite-wide token/cost governor (configured via BUDGET_* env vars)."""
+    global _budget
+    _budget = BudgetGovernor.from_env()
+    track_litellm_usage(_budget)
+    return _budget
+
+
+@pytest.fixture(scope="session")
+async def shared_agent(request, budget):
+    """
+    Recipe agent shared by all scenarios (use the `agent` fixture).
+
+    Pre-flight runs here, on the session event loop. Scenarios run with
+    `scenario.arun` on that same loop, so the agent's warmed connections are
+    the ones its measured turns use.
+    """
+    # Imported lazily so unit tests never pull in scenario/litellm
+    from agents.recipe_agent import create_openai_agent, create_custom_gateway_agent
+    
+    if USE_CUSTOM_GATEWAY:
+        recipe_agent = create_custom_gateway_agent(model=AGENT_MODEL, budget=budget)
+    else:
+        recipe_agent = create_openai_agent(model=AGENT_MODEL, budget=budget)
+
+    if preflight_enabled():
+        backends = build_backends(recipe_agent.client, AGENT_MODEL, USER_SIMULATOR_MODEL, JUDGE_MODEL, budget)
+        lines = format_preflight_report(await run_preflight(backends))
+        _write_lines(request.config, lines, title="pre-flight")
+
+    meter = asyncio.create_task(live_meter(budget, write=lambda line: _write_lines(request.config, [line])))
+    yield recipe_agent
+    meter.cancel()
+    await asyncio.gather(meter, return_exceptions=True)
+    await recipe_agent.aclose()
+
+
+@pytest.fixture
+def agent(request, shared_agent, budget):
+    """The shared recipe agent; prints the meter and this scenario's agent turn latencies afterwards."""
+    shared_agent.turn_latencies = []
+    yield shared_agent
+    latencies = ", ".join(f"{latency * 1000:.0f} ms" for latency in shared_agent.turn_latencies)
+    _write_lines(request.config, [f"  💰 {budget.meter()}", f"  ⏱️  agent turns: {latencies or 'none'}"])
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Print spend per model and any scenarios not run for budget reasons."""
+    if _budget is None:
+        return
+    terminalreporter.write_sep("-", "budget")
+    for line in _budget.report():
+        terminalreporter.write_line(line)
@@ -0,0 +1,54 @@
+"""
+Test the token/cost budget governor (no API calls).
+"""
+from types import SimpleNamespace
+import pytest
+from agents.budget import BudgetGovernor, Estimate, estimate_scenario, price
+from agents.preflight import client_backend, run_preflight
+
+
+def test_estimate_grows_with_turns():
+    """Test longer scenarios are estimated to cost more."""
+    short = estimate_scenario(2, "gpt-4o-mini", "gpt-4o-mini", "gpt-4o")
+    long = estimate_scenario(5, "gpt-4o-mini", "gpt-4o-mini", "gpt-4o")
+    assert long.tokens > short.tokens
+    assert long.cost > short.cost
+
+
+def test_scripted_turns_are_not_charged_to_the_simulator():
+    """Test scripted user turns drop the simulator calls from the estimate."""
+    simulated = estimate_scenario(4, "gpt-4o-mini", "gpt-4o", "gpt-4o-mini")
+    scripted = estimate_scenario(4, "gpt-4o-mini", "gpt-4o", "gpt-4o-mini", scripted_turns=2)
+    assert scripted.cost < simulated.cost
+    assert simulated.cost - scripted.cost == pytest.approx(price("gpt-4o", 250, 60) + price("gpt-4o", 250 + 410, 60))
+
+
+def test_unknown_models_are_free():
+    """Test gateway models without a price are counted as zero cost."""
+    assert price("Llama-3.3-70B-Instruct", 1000, 1000) == 0.0
+
+
+def test_governor_refuses_over_budget_and_downgrades_judge():
+    """Test caps refuse scenarios and the judge is downgraded near the cap."""
+    governor = BudgetGovernor(max_tokens=1000, judge_fallback_model="gpt-4o-mini", downgrade_at=0.5)
+    assert governor.admit("first", Estimate(tokens=400, cost=0.0))
+    assert governor.judge_model("gpt-4o") == "gpt-4o"
+
+    governor.record("openai/gpt-4o", prompt_tokens=500, completion_tokens=100)
+    assert governor.judge_model("gpt-4o") == "gpt-4o-mini"
+    assert not governor.admit("second", Estimate(tokens=500, cost=0.0))
+    assert governor.refused == ["second"]
+    assert governor.usage["gpt-4o"].cost == price("gpt-4o", 500, 100)
+
+
+@pytest.mark.asyncio
+async def test_preflight_usage_is_recorded():
+    """Test warm-up requests through the agent client count towards the budget."""
+    async def create(model, messages, max_tokens):
+        return SimpleNamespace(usage=SimpleNamespace(prompt_tokens=8, completion_tokens=1))
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    governor = BudgetGovernor()
+    await run_preflight([client_backend("agent", client, "gpt-4o-mini", governor)], pool_size=2)
+    assert governor.usage["gpt-4o-mini"].calls == 4
+    assert governor.spent_tokens == 36
@@ -0,0 +1,74 @@
+"""
+Test model comparison ranking and reporting (no API calls).
+"""
+from types import SimpleNamespace
+import pytest
+from agents.comparison import ModelRun, format_comparison_report, rank, run_turn
+
+
+def _chunk(content=None, completion_tokens=None):
+    """Build a ChatCompletionChunk-like object."""
+    if completion_tokens is not None:
+        return SimpleNamespace(choices=[], usage=SimpleNamespace(completion_tokens=completion_tokens))
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))], usage=None)
+
+
+class _FakeGateway:
+    """Stand-in for CustomGatewayClient streaming fixed chunks (or failing)."""
+
+    def __init__(self, chunks=None, error=None):
+        self.chunks = chunks or []
+        self.error = error
+
+    async def chat_completion_stream(self, model, messages):
+        if self.error:
+            raise self.error
+
+        async def stream():
+            for chunk in self.chunks:
+                yield chunk
+
+        return stream()
+
+
+def test_rank_prefers_passing_then_fastest():
+    """Test passing models rank above failing ones, fastest first."""
+    slow_pass = ModelRun("slow", latency=3.0, ttft=0.5, output_tokens=100, passed=True, passed_criteria=["a", "b"])
+    fast_pass = ModelRun("fast", latency=1.0, ttft=0.2, output_tokens=100, passed=True, passed_criteria=["a", "b"])
+    fastest_fail = ModelRun("fail", latency=0.5, ttft=0.1, output_tokens=50, passed=False,
+                            passed_criteria=["a"], failed_criteria=["b"])
+    broken = ModelRun("broken", error="timeout")
+
+    ranked = rank([broken, fastest_fail, slow_pass, fast_pass])
+    assert [run.model for run in ranked] == ["fast", "slow", "fail", "broken"]
+    assert fastest_fail.quality == 0.5
+
+    report = format_comparison_report(ranked)
+    assert report[-1] == "  ✅ Fastest passing model: fast (1000 ms)"
+
+
+@pytest.mark.asyncio
+async def test_run_turn_uses_usage_chunk():
+    """Test content, TTFT and output tokens from a stream ending in a usage chunk."""
+    gateway = _FakeGateway([_chunk(""), _chunk("Hello"), _chunk(" there"), _chunk(completion_tokens=7)])
+    run = await run_turn(gateway, "m", [{"role": "user", "content": "hi"}])
+    assert run.error is None
+    assert run.content == "Hello there"
+    assert run.output_tokens == 7
+    assert 0 <= run.ttft <= run.latency
+
+
+@pytest.mark.asyncio
+async def test_run_turn_counts_chunks_without_usage():
+    """Test output tokens fall back to the number of content chunks."""
+    gateway = _FakeGateway([_chunk("a"), _chunk("b"), _chunk("c")])
+    run = await run_turn(gateway, "m", [])
+    assert run.output_tokens == 3
+
+
+@pytest.mark.asyncio
+async def test_run_turn_records_errors():
+    """Test a failing stream is reported instead of raised."""
+    run = await run_turn(_FakeGateway(error=RuntimeError("model not found")), "m", [])
+    assert run.error == "model not found"
+    assert run.latency is None and run.ttft is None
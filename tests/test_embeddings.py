@@ -0,0 +1,129 @@
+"""
+Test embedding batching and vector caches (no API calls).
+"""
+import asyncio
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from agents.embeddings import DiskVectorCache, EmbeddingBatcher, LRUVectorCache, cache_key
+from agents.recipe_agent import CustomGatewayClient
+
+
+class _FakeEmbeddings:
+    """Stand-in for `client.embeddings` that records each request."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def create(self, model, input):
+        self.calls.append(list(input))
+        await self.release.wait()
+        # Returned out of order on purpose: the client must sort by index
+        data = [SimpleNamespace(index=i, embedding=[float(len(text)), 1.0]) for i, text in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+    async def close(self):
+        pass
+
+
+def _gateway(**kwargs):
+    gateway = CustomGatewayClient(base_url="http://gateway.invalid", **kwargs)
+    fake = _FakeEmbeddings()
+    gateway.client = SimpleNamespace(embeddings=fake, close=fake.close)
+    return gateway, fake
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test the LRU cache stays within its byte budget."""
+    vector = np.zeros(4, dtype=np.float32)
+    cache = LRUVectorCache(max_bytes=2 * vector.nbytes)
+    cache.put("a", vector)
+    cache.put("b", vector)
+    cache.get("a")
+    cache.put("c", vector)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.nbytes == 2 * vector.nbytes
+
+
+def test_disk_cache_persists_and_grows(tmp_path):
+    """Test vectors survive reopening and the memory map grows past its initial size."""
+    cache = DiskVectorCache(str(tmp_path))
+    count = DiskVectorCache.INITIAL_CAPACITY + 5
+    for i in range(count):
+        cache.put(cache_key("m", str(i)), np.full(3, i, dtype=np.float32))
+    cache.flush()
+
+    reopened = DiskVectorCache(str(tmp_path))
+    assert len(reopened) == count
+    np.testing.assert_array_equal(reopened.get(cache_key("m", str(count - 1))), np.full(3, count - 1))
+
+
+@pytest.mark.asyncio
+async def test_batcher_coalesces_and_dedupes():
+    """Test concurrent requests are sent as one deduplicated batch."""
+    calls = []
+
+    async def embed_batch(texts):
+        calls.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    batcher = EmbeddingBatcher(embed_batch, max_wait=0.01)
+    results = await asyncio.gather(*(batcher.embed(text) for text in ["a", "bb", "a"]))
+    assert calls == [["a", "bb"]]
+    assert [r.tolist() for r in results] == [[1.0], [2.0], [1.0]]
+
+
+@pytest.mark.asyncio
+async def test_client_embed_batches_caches_and_persists(tmp_path):
+    """Test embed() batches concurrent calls, serves repeats from cache and persists to disk."""
+    gateway, fake = _gateway(embedding_cache_dir=str(tmp_path))
+    single, matrix = await asyncio.gather(
+        gateway.embed("a", model="m"),
+        gateway.embed(["bb", "a", "bb"], model="m"),
+    )
+    assert fake.calls == [["a", "bb"]]
+    assert single.tolist() == [1.0, 1.0]
+    assert matrix.shape == (3, 2)
+    assert matrix[:, 0].tolist() == [2.0, 1.0, 2.0]
+
+    await gateway.embed(["a", "bb"], model="m")
+    assert len(fake.calls) == 1
+
+    await gateway.aclose()
+    reopened = DiskVectorCache(str(tmp_path))
+    assert len(reopened) == 2
+    np.testing.assert_array_equal(reopened.get(cache_key("m", "bb")), [2.0, 1.0])
+
+
+@pytest.mark.asyncio
+async def test_client_persists_in_batches(tmp_path):
+    """Test embed() leaves persistence to the disk cache's batching until aclose()."""
+    gateway, fake = _gateway(embedding_cache_dir=str(tmp_path))
+    gateway.embedding_disk_cache.flush_every = 2
+    await gateway.embed("a", model="m")
+    assert len(DiskVectorCache(str(tmp_path))) == 0
+    await gateway.embed("bb", model="m")
+    assert len(DiskVectorCache(str(tmp_path))) == 2
+    await gateway.embed("ccc", model="m")
+    assert len(DiskVectorCache(str(tmp_path))) == 2
+
+    await gateway.aclose()
+    assert len(DiskVectorCache(str(tmp_path))) == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_caller_does_not_cancel_shared_request():
+    """Test deduplicated callers are independent of each other's cancellation."""
+    gateway, fake = _gateway()
+    fake.release.clear()
+    first = asyncio.create_task(gateway.embed("shared", model="m"))
+    second = asyncio.create_task(gateway.embed("shared", model="m"))
+    await asyncio.sleep(0.05)
+
+    first.cancel()
+    fake.release.set()
+    assert (await second).tolist() == [6.0, 1.0]
+    assert first.cancelled()
@@ -6,7 +6,8 @@ import warnings
 import pytest
 from dotenv import load_dotenv
 import scenario
-from agents.recipe_agent import create_openai_agent, create_custom_gateway_agent
+from agents.budget import estimate_scenario
+from agents.scripted_user import ScriptedUserAgent
 
 load_dotenv()
 
@@ -41,11 +42,19 @@ DEFAULT_CRITERIA = [
 ]
 
 
-def _create_agent():
-    """Create recipe agent based on configuration."""
-    if USE_CUSTOM_GATEWAY:
-        return create_custom_gateway_agent(model=AGENT_MODEL)
-    return create_openai_agent(model=AGENT_MODEL)
+def _admit(budget, name, max_turns, criteria=DEFAULT_CRITERIA, scripted_turns=0):
+    """
+    Skip the scenario if it doesn't fit the remaining budget; return the judge model to use.
+
+    `scripted_turns` user messages come from a ScriptedUserAgent and aren't charged as simulator calls.
+    """
+    judge_model = budget.judge_model(JUDGE_MODEL)
+    estimate = estimate_scenario(
+        max_turns, AGENT_MODEL, USER_SIMULATOR_MODEL, judge_model, len(criteria), scripted_turns=scripted_turns
+    )
+    if not budget.admit(name, estimate):
+        pytest.skip(f"Budget exhausted (needs ~{estimate.tokens:,} tokens / ${estimate.cost:.4f}): {budget.meter()}")
+    return judge_model
 
 
 def _get_failure_message(result):
@@ -62,11 +71,12 @@ def _get_failure_message(result):
 
 
 @pytest.mark.scenario
+@pytest.mark.priority(10)
 @pytest.mark.asyncio
-async def test_vegetarian_recipe_agent():
+async def test_vegetarian_recipe_agent(agent, budget):
     """Test basic vegetarian recipe request."""
-    agent = _create_agent()
-    result = await scenario.run(
+    judge_model = _admit(budget, "vegetarian recipe request", max_turns=5)
+    result = await scenario.arun(
         name="vegetarian recipe request",
         description="""
             It's Saturday evening, the user is very hungry and tired,
@@ -76,7 +86,7 @@ async def test_vegetarian_recipe_agent():
         agents=[
             agent,
             scenario.UserSimulatorAgent(model=USER_SIMULATOR_MODEL),
-            scenario.JudgeAgent(model=JUDGE_MODEL, criteria=DEFAULT_CRITERIA),
+            scenario.JudgeAgent(model=judge_model, criteria=DEFAULT_CRITERIA),
         ],
         max_turns=5,
     )
@@ -85,16 +95,22 @@ async def test_vegetarian_recipe_agent():
 
 @pytest.mark.scenario
 @pytest.mark.asyncio
-async def test_recipe_agent_handles_follow_up():
+async def test_recipe_agent_handles_follow_up(agent, budget):
     """Test agent handles follow-up questions appropriately."""
-    agent = _create_agent()
-    result = await scenario.run(
+    judge_model = _admit(budget, "recipe follow-up question", max_turns=4, scripted_turns=2)
+    result = await scenario.arun(
         name="recipe follow-up question",
         description="User asks for a recipe, then asks about substitutions.",
         agents=[
             agent,
-            scenario.UserSimulatorAgent(model=USER_SIMULATOR_MODEL),
-            scenario.JudgeAgent(model=JUDGE_MODEL, criteria=DEFAULT_CRITERIA),
+            ScriptedUserAgent(
+                turns=[
+                    "Can you give me a recipe for a quick vegetarian dinner?",
+                    "What could I substitute if I don't have one of the main ingredients?",
+                ],
+                fallback=scenario.UserSimulatorAgent(model=USER_SIMULATOR_MODEL),
+            ),
+            scenario.JudgeAgent(model=judge_model, criteria=DEFAULT_CRITERIA),
         ],
         max_turns=4,
     )
@@ -103,16 +119,16 @@ async def test_recipe_agent_handles_follow_up():
 
 @pytest.mark.scenario
 @pytest.mark.asyncio
-async def test_recipe_with_specific_cuisine():
+async def test_recipe_with_specific_cuisine(agent, budget):
     """Test recipe request for specific cuisine type."""
-    agent = _create_agent()
-    result = await scenario.run(
+    judge_model = _admit(budget, "specific cuisine recipe", max_turns=5)
+    result = await scenario.arun(
         name="specific cuisine recipe",
         description="User wants an Italian vegetarian recipe.",
         agents=[
             agent,
             scenario.UserSimulatorAgent(model=USER_SIMULATOR_MODEL),
-            scenario.JudgeAgent(model=JUDGE_MODEL, criteria=DEFAULT_CRITERIA),
+            scenario.JudgeAgent(model=judge_model, criteria=DEFAULT_CRITERIA),
         ],
         max_turns=5,
     )
@@ -121,19 +137,23 @@ async def test_recipe_with_specific_cuisine():
 
 @pytest.mark.scenario
 @pytest.mark.asyncio
-async def test_recipe_with_dietary_restrictions():
+async def test_recipe_with_dietary_restrictions(agent, budget):
     """Test recipe request with specific dietary restrictions."""
-    agent = _create_agent()
     criteria = DEFAULT_CRITERIA + [
         "Recipe should accommodate dietary restrictions mentioned by user",
     ]
-    result = await scenario.run(
+    judge_model = _admit(budget, "dietary restrictions recipe", max_turns=5, criteria=criteria, scripted_turns=1)
+    result = await scenario.arun(
         name="dietary restrictions recipe",
         description="User wants a gluten-free vegetarian recipe.",
         agents=[
             agent,
-            scenario.UserSimulatorAgent(model=USER_SIMULATOR_MODEL),
-            scenario.JudgeAgent(model=JUDGE_MODEL, criteria=criteria),
+            ScriptedUserAgent(
+                turns=["I need a {restriction} vegetarian recipe for dinner tonight."],
+                variables={"restriction": "gluten-free"},
+                fallback=scenario.UserSimulatorAgent(model=USER_SIMULATOR_MODEL),
+            ),
+            scenario.JudgeAgent(model=judge_model, criteria=criteria),
         ],
         max_turns=5,
     )
@@ -142,16 +162,16 @@ async def test_recipe_with_dietary_restrictions():
 
 @pytest.mark.scenario
 @pytest.mark.asyncio
-async def test_recipe_with_time_constraint():
+async def test_recipe_with_time_constraint(agent, budget):
     """Test recipe request with time constraint."""
-    agent = _create_agent()
-    result = await scenario.run(
+    judge_model = _admit(budget, "quick recipe request", max_turns=5)
+    result = await scenario.arun(
         name="quick recipe request",
         description="User needs a recipe that can be made in under 20 minutes.",
         agents=[
             agent,
             scenario.UserSimulatorAgent(model=USER_SIMULATOR_MODEL),
-            scenario.JudgeAgent(model=JUDGE_MODEL, criteria=DEFAULT_CRITERIA),
+            scenario.JudgeAgent(model=judge_model, criteria=DEFAULT_CRITERIA),
         ],
         max_turns=5,
     )
@@ -0,0 +1,57 @@
+"""
+Test the scripted user agent (no API calls).
+"""
+from types import SimpleNamespace
+import pytest
+import scenario
+from agents.scripted_user import ScriptedUserAgent
+
+
+class _EchoUser(scenario.AgentAdapter):
+    """Fallback user that records it was called."""
+    role = scenario.AgentRole.USER
+
+    async def call(self, input):
+        return "fallback"
+
+
+def _input(*messages):
+    return SimpleNamespace(messages=list(messages))
+
+
+@pytest.mark.asyncio
+async def test_plays_templated_turns_then_closes():
+    """Test turns are filled from variables and replayed in order."""
+    user = ScriptedUserAgent(turns=["I want a {diet} recipe", "Thanks!"], variables={"diet": "vegan"})
+    assert await user.call(_input()) == "I want a vegan recipe"
+    assert await user.call(_input({"role": "assistant", "content": "Here you go."})) == "Thanks!"
+    assert await user.call(_input()) == user.closing_message
+    assert user.scripted_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_turns_without_variables_are_verbatim():
+    """Test braces in a fixed turn are left alone when no variables are given."""
+    user = ScriptedUserAgent(turns=['Can you return it as {"title": ..., "steps": [...]}?'])
+    assert await user.call(_input()) == 'Can you return it as {"title": ..., "steps": [...]}?'
+
+
+@pytest.mark.asyncio
+async def test_falls_back_on_unscripted_question():
+    """Test the fallback answers agent questions and the script resumes afterwards."""
+    user = ScriptedUserAgent(turns=["Recipe please", "Any substitutions?"], fallback=_EchoUser())
+    assert await user.call(_input()) == "Recipe please"
+    assert await user.call(_input({"role": "assistant", "content": "Sure!\nWhich cuisine do you prefer?"})) == "fallback"
+    assert await user.call(_input({"role": "assistant", "content": "Here is a recipe."})) == "Any substitutions?"
+    assert await user.call(_input({"role": "assistant", "content": "Use tofu."})) == "fallback"
+    assert (user.scripted_calls, user.fallback_calls) == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_answer_ending_in_question_keeps_script():
+    """Test a full answer that ends with a question does not trigger the fallback."""
+    user = ScriptedUserAgent(turns=["Recipe please", "Any substitutions?"], fallback=_EchoUser())
+    await user.call(_input())
+    recipe = "Ingredients:\n- 200g pasta\n- 1 zucchini\n\nSteps:\n1. Boil pasta.\n2. Add zucchini.\n\nWould you like a variation?"
+    assert await user.call(_input({"role": "assistant", "content": recipe})) == "Any substitutions?"
+    assert user.fallback_calls == 0